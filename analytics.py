@@ -0,0 +1,239 @@
+import os
+import sqlite3
+import logging
+import threading
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:
+    # DuckDB is optional; without it every query runs against SQLite
+    duckdb = None
+
+# Analytics Configuration
+ANALYTICS_CONFIG = {
+    'backend': 'sqlite',   # 'sqlite' or 'duckdb'
+    'duckdb_path': None,   # Defaults to the SQLite path with a .duckdb extension
+    'min_rows': 5000,      # Smaller uploads stay on SQLite, which is faster for them
+}
+
+SKIPPED_TABLES = ('xer_files', 'sqlite_sequence')
+
+# One open DuckDB connection per mirror file, shared by reports and ingest in
+# this process. Opening the file costs more than a report query on a typical
+# upload, and DuckDB lets only one process hold a file open for writing.
+_analytics_connections = {}
+_analytics_connections_lock = threading.Lock()
+
+def analytics_enabled():
+    """Return True if report queries should be routed to the DuckDB mirror."""
+    return ANALYTICS_CONFIG['backend'] == 'duckdb' and duckdb is not None
+
+def get_analytics_path(db_path):
+    """Return the path of the DuckDB file mirroring the SQLite database at db_path."""
+    if ANALYTICS_CONFIG['duckdb_path']:
+        return ANALYTICS_CONFIG['duckdb_path']
+    return os.path.splitext(db_path)[0] + '.duckdb'
+
+def get_analytics_connection(analytics_path):
+    """Return a new cursor on the cached DuckDB connection for analytics_path.
+
+    Each cursor is an independent connection to the same database, so callers
+    can use it from their own thread and must close it when done.
+    """
+    with _analytics_connections_lock:
+        if analytics_path not in _analytics_connections:
+            _analytics_connections[analytics_path] = duckdb.connect(analytics_path)
+        return _analytics_connections[analytics_path].cursor()
+
+def column_type(column):
+    """Return the DuckDB type used to mirror a SQLite column.
+
+    Values are kept as the raw text stored in SQLite so both backends see the
+    same data; queries that aggregate numbers cast explicitly.
+    """
+    if column == 'xer_file_id':
+        return 'BIGINT'
+    return 'VARCHAR'
+
+def column_select(column):
+    """Return the expression converting a frame column to its mirrored type."""
+    return f'CAST("{column}" AS {column_type(column)})'
+
+def get_upload_identity(conn, upload_id):
+    """Return the (filename, upload_date) recorded in SQLite for an upload, or None."""
+    row = conn.execute("SELECT filename, upload_date FROM xer_files WHERE id = ?", (upload_id,)).fetchone()
+    if row is None:
+        return None
+    return (row[0], str(row[1]))
+
+def sync_table_schema(conn, table_name, columns):
+    """Create the mirrored table, or add any columns it is missing."""
+    existing = conn.execute(
+        "SELECT column_name FROM information_schema.columns WHERE table_name = ?",
+        [table_name]
+    ).fetchall()
+    existing_columns = [row[0] for row in existing]
+
+    if not existing_columns:
+        fields = ', '.join(f'"{column}" {column_type(column)}' for column in columns)
+        conn.execute(f'CREATE TABLE "{table_name}" ({fields})')
+        return
+
+    for column in columns:
+        if column not in existing_columns:
+            conn.execute(f'ALTER TABLE "{table_name}" ADD COLUMN "{column}" {column_type(column)}')
+
+def mirror_upload(db_path, upload_id):
+    """Copy one upload's rows from SQLite into the DuckDB analytics file.
+
+    SQLite stays the system of record; the mirror is rebuilt per upload, so
+    calling this again for the same upload replaces its rows. The upload's
+    filename and upload date are stored alongside so a mirror left over from
+    a different SQLite database is never used.
+    """
+    if not analytics_enabled():
+        return False
+
+    conn = sqlite3.connect(db_path)
+    try:
+        identity = get_upload_identity(conn, upload_id)
+        if identity is None:
+            logging.warning(f"Upload {upload_id} not found in {db_path}; nothing to mirror")
+            return False
+
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+        tables = [row[0] for row in cursor.fetchall() if row[0] not in SKIPPED_TABLES]
+        frames = {}
+        for table_name in tables:
+            frames[table_name] = pd.read_sql_query(
+                f'SELECT * FROM "{table_name}" WHERE xer_file_id = ?', conn, params=(upload_id,)
+            )
+    finally:
+        conn.close()
+
+    analytics_conn = get_analytics_connection(get_analytics_path(db_path))
+    try:
+        analytics_conn.execute("BEGIN TRANSACTION")
+        try:
+            analytics_conn.execute("""CREATE TABLE IF NOT EXISTS mirrored_uploads
+                                      (xer_file_id BIGINT PRIMARY KEY,
+                                       filename VARCHAR NOT NULL,
+                                       upload_date VARCHAR NOT NULL,
+                                       row_count BIGINT NOT NULL,
+                                       mirrored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
+            analytics_conn.execute("DELETE FROM mirrored_uploads WHERE xer_file_id = ?", [upload_id])
+
+            for table_name, df in frames.items():
+                sync_table_schema(analytics_conn, table_name, list(df.columns))
+                analytics_conn.execute(f'DELETE FROM "{table_name}" WHERE xer_file_id = ?', [upload_id])
+                if df.empty:
+                    continue
+                analytics_conn.register('upload_frame', df)
+                columns = ', '.join(f'"{column}"' for column in df.columns)
+                values = ', '.join(column_select(column) for column in df.columns)
+                analytics_conn.execute(f'INSERT INTO "{table_name}" ({columns}) SELECT {values} FROM upload_frame')
+                analytics_conn.unregister('upload_frame')
+
+            analytics_conn.execute(
+                "INSERT INTO mirrored_uploads (xer_file_id, filename, upload_date, row_count) VALUES (?, ?, ?, ?)",
+                [upload_id, *identity, sum(len(df) for df in frames.values())]
+            )
+            analytics_conn.execute("COMMIT")
+        except Exception:
+            # Don't let a failed rollback hide the original error
+            try:
+                analytics_conn.execute("ROLLBACK")
+            except duckdb.Error as e:
+                logging.error(f"Error rolling back analytics mirror of upload {upload_id}: {e}")
+            raise
+    finally:
+        analytics_conn.close()
+
+    logging.info(f"Mirrored upload {upload_id} to {get_analytics_path(db_path)}")
+    return True
+
+def get_mirrored_row_count(analytics_conn, upload_id, identity):
+    """Return the row count of the mirrored upload, or None if the mirror does not hold it."""
+    try:
+        row = analytics_conn.execute(
+            "SELECT filename, upload_date, row_count FROM mirrored_uploads WHERE xer_file_id = ?", [upload_id]
+        ).fetchone()
+    except duckdb.Error:
+        return None
+    if row is None or tuple(row[:2]) != identity:
+        return None
+    return row[2]
+
+def connect_analytics(conn, db_path, upload_id):
+    """Open the DuckDB mirror for one upload's queries.
+
+    conn is the caller's SQLite connection, used to check the upload's
+    identity. Returns None when the backend is disabled, the mirror does not
+    hold the upload (or holds a different upload under the same id), or the
+    upload is smaller than ANALYTICS_CONFIG['min_rows'], so callers can fall
+    back to SQLite. Close the returned connection when done.
+    """
+    if not analytics_enabled():
+        return None
+
+    analytics_path = get_analytics_path(db_path)
+    if not os.path.exists(analytics_path):
+        return None
+
+    identity = get_upload_identity(conn, upload_id)
+    if identity is None:
+        return None
+
+    try:
+        analytics_conn = get_analytics_connection(analytics_path)
+    except duckdb.Error as e:
+        logging.warning(f"Error connecting to analytics database: {e}")
+        return None
+
+    row_count = get_mirrored_row_count(analytics_conn, upload_id, identity)
+    if row_count is None or row_count < ANALYTICS_CONFIG['min_rows']:
+        analytics_conn.close()
+        return None
+    return analytics_conn
+
+def execute_analytics_query(analytics_conn, query, params=None):
+    """Run a query against the DuckDB mirror and return the results as a DataFrame.
+
+    Returns None when there is no mirror connection or the query fails, so
+    callers can fall back to SQLite.
+    """
+    if analytics_conn is None:
+        return None
+
+    try:
+        return analytics_conn.execute(query, list(params or [])).df()
+    except duckdb.Error as e:
+        logging.warning(f"Error executing analytics query, falling back to SQLite: {e}")
+        return None
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 2:
+        print("Usage: python analytics.py <database_path> [upload_id]")
+        sys.exit(1)
+
+    if duckdb is None:
+        print("DuckDB is not installed; run `pip install duckdb` first")
+        sys.exit(1)
+
+    ANALYTICS_CONFIG['backend'] = 'duckdb'
+    db_path = sys.argv[1]
+
+    # Backfill the mirror for one upload, or for every upload in the database
+    if len(sys.argv) > 2:
+        upload_ids = [int(sys.argv[2])]
+    else:
+        conn = sqlite3.connect(db_path)
+        upload_ids = [row[0] for row in conn.execute("SELECT id FROM xer_files ORDER BY id").fetchall()]
+        conn.close()
+
+    for upload_id in upload_ids:
+        mirror_upload(db_path, upload_id)
+        print(f"Upload {upload_id} mirrored to: {get_analytics_path(db_path)}")
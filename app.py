@@ -4,6 +4,7 @@ from werkzeug.utils import secure_filename
 import sqlite3
 import logging
 import pandas as pd
+from analytics import mirror_upload
 from db_processor import export_database_to_excel, export_specific_upload
 from reports import generate_project_overview_report, generate_task_timeline_report, generate_resource_allocation_report, REPORT_VERSION
 
@@ -95,6 +96,14 @@ def parse_xer_and_update_db(file_path):
             conn.commit()
         
         logging.info(f"Successfully parsed and updated database with file: {file_path}")
+        
+        # Mirror the upload into the analytics database; SQLite remains the system of record
+        try:
+            mirror_upload(app.config['DATABASE'], xer_file_id)
+        except Exception as e:
+            logging.error(f"Error mirroring upload {xer_file_id} to analytics database: {type(e).__name__}: {str(e)}. "
+                          f"Reports for this upload will use SQLite until it is mirrored with "
+                          f"`python analytics.py {app.config['DATABASE']} {xer_file_id}` while the app is stopped")
     except Exception as e:
         logging.error(f"Error parsing XER file: {str(e)}")
         raise
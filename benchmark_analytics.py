@@ -0,0 +1,299 @@
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+import pandas as pd
+import reports
+import app as programme_app
+from db_processor import export_specific_upload
+from analytics import ANALYTICS_CONFIG, duckdb, connect_analytics, execute_analytics_query
+
+# Compares report query times on the SQLite row store against the DuckDB
+# analytics mirror, using a synthetic XER file with a configurable task count.
+# Before timing, it checks that both backends return the same results and that
+# queries fall back to SQLite when the mirror cannot serve them.
+
+def write_synthetic_xer(path, num_tasks):
+    """Write an XER file with one project and num_tasks tasks, plus related tables."""
+    rng = random.Random(42)
+    num_resources = max(10, num_tasks // 50)
+    tables = {
+        'PROJECT': (['proj_id', 'proj_short_name', 'plan_start_date', 'plan_end_date', 'scd_end_date',
+                     'proj_url', 'location_id', 'fy_start_month_num'],
+                    [['1', 'BENCH', '2024-01-01 08:00', '2026-12-31 17:00', '2026-12-31 17:00', '', '', '1']]),
+        'CALENDAR': (['clndr_id', 'clndr_name'], [['1', 'Standard']]),
+        'RSRC': (['rsrc_id', 'rsrc_name', 'clndr_id'],
+                 [[str(r), f'Resource {r}', '1'] for r in range(num_resources)]),
+        'RSRCRATE': (['rsrc_rate_id', 'rsrc_id', 'cost_per_qty'],
+                     [[str(r), str(r), f'{rng.uniform(50, 200):.2f}'] for r in range(num_resources)]),
+        'RCATVAL': (['rsrc_catg_id', 'rsrc_catg_name'], [[str(c), f'Category {c}'] for c in range(5)]),
+        'RSRCRCAT': (['rsrc_id', 'rsrc_catg_id'], [[str(r), str(r % 5)] for r in range(num_resources)]),
+        'ACTVCODE': (['actv_code_id', 'actv_code_type_id', 'actv_code_name'],
+                     [[str(a), str(a % 3), f'Code {a}'] for a in range(20)]),
+        'TASK': (['task_id', 'proj_id', 'wbs_id', 'task_code', 'task_name', 'task_type', 'early_start_date',
+                  'early_end_date', 'late_start_date', 'late_end_date', 'total_float_hr_cnt',
+                  'free_float_hr_cnt', 'cstr_type', 'cstr_date'], []),
+        'TASKPRED': (['task_pred_id', 'task_id', 'pred_task_id', 'pred_type'], []),
+        'TASKRSRC': (['taskrsrc_id', 'task_id', 'rsrc_id', 'target_qty', 'act_reg_qty', 'remain_qty',
+                      'target_cost', 'curv_id'], []),
+        'TASKACTV': (['task_id', 'actv_code_id'], []),
+        'TASKMEMO': (['memo_id', 'task_id', 'task_memo'], []),
+        'UDFVALUE': (['udf_type_id', 'fk_id', 'proj_id', 'udf_text'], []),
+    }
+
+    # Some resources have several rates, where text and numeric MAX disagree
+    for r in range(0, num_resources, 3):
+        tables['RSRCRATE'][1].append([str(num_resources + r), str(r), '99.00'])
+
+    for t in range(num_tasks):
+        day = 1 + t % 28
+        task_type = 'Milestone' if t % 100 == 0 else 'Task'
+        tables['TASK'][1].append([str(t), '1', str(t % 40), f'A{t:06d}', f'Task {t}', task_type,
+                                  f'2025-01-{day:02d} 08:00', f'2025-02-{day:02d} 17:00',
+                                  f'2025-01-{day:02d} 08:00', f'2025-02-{day:02d} 17:00',
+                                  str(rng.randint(0, 400)), str(rng.randint(0, 80)), '', ''])
+        if t:
+            tables['TASKPRED'][1].append([str(t), str(t), str(t - 1), 'PR_FS'])
+        for n in range(2):
+            qty = rng.uniform(8, 160)
+            tables['TASKRSRC'][1].append([str(t * 2 + n), str(t), str(rng.randrange(num_resources)),
+                                          f'{qty:.1f}', f'{qty / 2:.1f}', f'{qty / 2:.1f}',
+                                          f'{qty * 100:.2f}', '1'])
+        tables['TASKACTV'][1].append([str(t), str(t % 20)])
+        tables['TASKMEMO'][1].append([str(t), str(t), f'Memo for task {t}'])
+        tables['UDFVALUE'][1].append(['1', str(t), '1', f'Value {t % 7}'])
+
+    with open(path, 'w', encoding='latin-1') as file:
+        file.write('ERMHDR\t19.12\n')
+        for table_name, (fields, records) in tables.items():
+            file.write(f'%T\t{table_name}\n')
+            file.write('%F\t' + '\t'.join(fields) + '\n')
+            for record in records:
+                file.write('%R\t' + '\t'.join(record) + '\n')
+        file.write('%E\n')
+
+def normalize_frame(df):
+    """Return df in a form that compares equal across backends.
+
+    Rows are sorted, GROUP_CONCAT lists are sorted (their order is undefined on
+    both engines), and nulls share a single representation.
+    """
+    df = df.copy()
+    for column in df.columns:
+        if pd.api.types.is_numeric_dtype(df[column]) and df[column].notna().any():
+            df[column] = df[column].astype(float)
+        else:
+            df[column] = [None if pd.isna(value) else ','.join(sorted(str(value).split(',')))
+                          for value in df[column]]
+            df[column] = df[column].fillna('<NULL>')
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+def run_report_queries(db_path, upload_id, repeat):
+    """Run each report repeat times and return its query timings and results.
+
+    Only opening the connections and running the queries is timed, so
+    workbook formatting does not skew the comparison. Returns the best total
+    time per report and the DataFrames returned by each query on the first run.
+    """
+    original_functions = {
+        'create_connection': reports.create_connection,
+        'connect_analytics': reports.connect_analytics,
+        'execute_query': reports.execute_query,
+    }
+    calls = []
+
+    def timed(name):
+        def timed_function(*args, **kwargs):
+            start = time.perf_counter()
+            result = original_functions[name](*args, **kwargs)
+            calls.append((name, time.perf_counter() - start, result))
+            return result
+        return timed_function
+
+    report_functions = {
+        'project_overview': reports.generate_project_overview_report,
+        'task_timeline': reports.generate_task_timeline_report,
+        'resource_allocation': reports.generate_resource_allocation_report,
+    }
+
+    timings = {}
+    results = {}
+    for name in original_functions:
+        setattr(reports, name, timed(name))
+    try:
+        for name, generate_report in report_functions.items():
+            runs = []
+            for run in range(repeat):
+                calls.clear()
+                output_path = generate_report(db_path, upload_id)
+                if output_path:
+                    os.remove(output_path)
+                runs.append(sum(elapsed for _, elapsed, _ in calls))
+                if run == 0:
+                    results[name] = [df for function, _, df in calls if function == 'execute_query']
+            timings[name] = min(runs)
+    finally:
+        for name, function in original_functions.items():
+            setattr(reports, name, function)
+    return timings, results
+
+def compare_backends(sqlite_results, duckdb_results):
+    """Return a list of report queries whose results differ between backends."""
+    mismatches = []
+    for name, sqlite_frames in sqlite_results.items():
+        duckdb_frames = duckdb_results[name]
+        if len(sqlite_frames) != len(duckdb_frames):
+            mismatches.append(f"{name}: ran {len(sqlite_frames)} queries on SQLite, {len(duckdb_frames)} on DuckDB")
+            continue
+        for index, (sqlite_df, duckdb_df) in enumerate(zip(sqlite_frames, duckdb_frames)):
+            if sqlite_df is None or duckdb_df is None:
+                mismatches.append(f"{name} query {index}: no result")
+                continue
+            try:
+                pd.testing.assert_frame_equal(normalize_frame(sqlite_df), normalize_frame(duckdb_df),
+                                              check_dtype=False, rtol=1e-9)
+            except AssertionError as e:
+                mismatches.append(f"{name} query {index}: {e}")
+    return mismatches
+
+def compare_exports(db_path, upload_id):
+    """Return a list of sheets that differ between SQLite and DuckDB exports of an upload."""
+    sheets = {}
+    for backend in ('sqlite', 'duckdb'):
+        ANALYTICS_CONFIG['backend'] = backend
+        output_path = export_specific_upload(db_path, upload_id)
+        sheets[backend] = pd.read_excel(output_path, sheet_name=None, dtype=str)
+        os.remove(output_path)
+
+    if list(sheets['sqlite']) != list(sheets['duckdb']):
+        return [f"export sheets differ: {list(sheets['sqlite'])} != {list(sheets['duckdb'])}"]
+
+    mismatches = []
+    for sheet_name, sqlite_df in sheets['sqlite'].items():
+        try:
+            pd.testing.assert_frame_equal(sqlite_df, sheets['duckdb'][sheet_name])
+        except AssertionError as e:
+            mismatches.append(f"export sheet {sheet_name}: {e}")
+    return mismatches
+
+def serves_from_mirror(db_path, upload_id):
+    """Return True if connect_analytics would route this upload's queries to DuckDB."""
+    conn = sqlite3.connect(db_path)
+    try:
+        analytics_conn = connect_analytics(conn, db_path, upload_id)
+    finally:
+        conn.close()
+    if analytics_conn is None:
+        return False
+    analytics_conn.close()
+    return True
+
+def check_fallbacks(db_path, upload_id):
+    """Return a list of failures in the routing and SQLite fallback logic."""
+    failures = []
+
+    if not serves_from_mirror(db_path, upload_id):
+        failures.append("mirrored upload was not served from DuckDB")
+
+    # An upload that exists in SQLite but was never mirrored
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT filename FROM xer_files WHERE id = ?", (upload_id,))
+        filename = cursor.fetchone()[0]
+        cursor.execute("INSERT INTO xer_files (filename) VALUES ('unmirrored.xer')")
+        unmirrored_id = cursor.lastrowid
+        conn.commit()
+        if serves_from_mirror(db_path, unmirrored_id):
+            failures.append("unmirrored upload was served from DuckDB")
+
+        # A mirror built from a different database that reused this upload id
+        cursor.execute("UPDATE xer_files SET filename = 'replaced.xer' WHERE id = ?", (upload_id,))
+        conn.commit()
+        if serves_from_mirror(db_path, upload_id):
+            failures.append("stale mirror was served from DuckDB")
+    finally:
+        conn.rollback()
+        conn.execute("DELETE FROM xer_files WHERE filename = 'unmirrored.xer'")
+        conn.execute("UPDATE xer_files SET filename = ? WHERE id = ?", (filename, upload_id))
+        conn.commit()
+        conn.close()
+
+    # An upload below the size threshold
+    ANALYTICS_CONFIG['min_rows'] = float('inf')
+    try:
+        if serves_from_mirror(db_path, upload_id):
+            failures.append("upload below min_rows was served from DuckDB")
+    finally:
+        ANALYTICS_CONFIG['min_rows'] = 0
+
+    # A missing mirror file
+    ANALYTICS_CONFIG['duckdb_path'] = db_path + '.missing.duckdb'
+    try:
+        if serves_from_mirror(db_path, upload_id):
+            failures.append("missing mirror was served from DuckDB")
+    finally:
+        ANALYTICS_CONFIG['duckdb_path'] = None
+
+    # A query DuckDB cannot run must still be answered by SQLite
+    sqlite_only_query = "SELECT task_id, sqlite_version() AS version FROM TASK WHERE xer_file_id = ?"
+    conn = reports.create_connection(db_path)
+    analytics_conn = connect_analytics(conn, db_path, upload_id)
+    try:
+        if execute_analytics_query(analytics_conn, sqlite_only_query, (upload_id,)) is not None:
+            failures.append("failed DuckDB query returned a result")
+        df = reports.execute_query(conn, sqlite_only_query, params=(upload_id,), analytics_conn=analytics_conn)
+    finally:
+        conn.close()
+        if analytics_conn:
+            analytics_conn.close()
+    if df is None or 'version' not in df.columns:
+        failures.append("failed DuckDB query did not fall back to SQLite")
+
+    return failures
+
+if __name__ == "__main__":
+    if duckdb is None:
+        print("DuckDB is not installed; run `pip install duckdb` first")
+        sys.exit(1)
+
+    num_tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeat = 3
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        xer_path = os.path.join(temp_dir, 'benchmark.xer')
+        programme_app.app.config['DATABASE'] = os.path.join(temp_dir, 'benchmark.db')
+        ANALYTICS_CONFIG['backend'] = 'duckdb'
+        # Route every upload to DuckDB so the engines are compared at any size
+        ANALYTICS_CONFIG['min_rows'] = 0
+        programme_app.init_db()
+
+        write_synthetic_xer(xer_path, num_tasks)
+        start = time.perf_counter()
+        programme_app.parse_xer_and_update_db(xer_path)
+        print(f"Ingested {num_tasks} tasks (including DuckDB mirror) in {time.perf_counter() - start:.2f}s")
+
+        db_path = programme_app.app.config['DATABASE']
+        failures = check_fallbacks(db_path, 1)
+        failures += compare_exports(db_path, 1)
+
+        ANALYTICS_CONFIG['backend'] = 'sqlite'
+        sqlite_timings, sqlite_results = run_report_queries(db_path, 1, repeat)
+        ANALYTICS_CONFIG['backend'] = 'duckdb'
+        duckdb_timings, duckdb_results = run_report_queries(db_path, 1, repeat)
+        failures += compare_backends(sqlite_results, duckdb_results)
+
+    if failures:
+        print("Backend checks failed:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("Backend checks passed: same report query results and exports, SQLite fallback works")
+
+    # Timings cover opening connections and running the report queries, for this one synthetic upload size
+    print(f"{'Report queries':<22}{'SQLite (s)':>12}{'DuckDB (s)':>12}{'Speedup':>10}")
+    for name in sqlite_timings:
+        speedup = sqlite_timings[name] / duckdb_timings[name]
+        print(f"{name:<22}{sqlite_timings[name]:>12.3f}{duckdb_timings[name]:>12.3f}{speedup:>9.1f}x")
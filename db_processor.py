@@ -2,6 +2,7 @@ import sqlite3
 import pandas as pd
 import os
 import tempfile
+from analytics import connect_analytics, execute_analytics_query
 
 def export_database_to_excel(db_path):
     conn = sqlite3.connect(db_path)
@@ -27,6 +28,7 @@ def export_database_to_excel(db_path):
 
 def export_specific_upload(db_path, upload_id):
     conn = sqlite3.connect(db_path)
+    analytics_conn = connect_analytics(conn, db_path, upload_id)
     
     # Get all table names
     cursor = conn.cursor()
@@ -47,11 +49,17 @@ def export_specific_upload(db_path, upload_id):
                 # Skip this system table
                 continue
             else:
-                df = pd.read_sql_query(f"SELECT * FROM {table_name} WHERE xer_file_id = ?", conn, params=(upload_id,))
+                # Served from the DuckDB analytics mirror when it holds this upload, otherwise from SQLite
+                query = f'SELECT * FROM "{table_name}" WHERE xer_file_id = ?'
+                df = execute_analytics_query(analytics_conn, query, params=(upload_id,))
+                if df is None:
+                    df = pd.read_sql_query(query, conn, params=(upload_id,))
             if not df.empty:
                 df.to_excel(writer, sheet_name=table_name, index=False)
     
     conn.close()
+    if analytics_conn:
+        analytics_conn.close()
     return output_path
 
 # Placeholder for future export functions
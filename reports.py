@@ -1,6 +1,7 @@
 import sqlite3
 import pandas as pd
 import tempfile
+from analytics import connect_analytics, execute_analytics_query
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, PatternFill
 from openpyxl.utils import get_column_letter
@@ -43,8 +44,16 @@ def create_connection(db_path):
         print(f"Error connecting to database: {e}")
         return None
 
-def execute_query(conn, query, params=None):
-    """Execute a SQL query and return the results as a DataFrame."""
+def execute_query(conn, query, params=None, analytics_conn=None):
+    """Execute a SQL query and return the results as a DataFrame.
+
+    When analytics_conn (from connect_analytics) is given, the query runs on
+    the DuckDB analytics mirror first and falls back to SQLite if it fails.
+    """
+    df = execute_analytics_query(analytics_conn, query, params)
+    if df is not None:
+        return df
+
     try:
         if params:
             return pd.read_sql_query(query, conn, params=params)
@@ -99,25 +108,28 @@ def generate_project_overview_report(db_path, upload_id):
     if not conn:
         return None
 
+    analytics_conn = None
     try:
+        analytics_conn = connect_analytics(conn, db_path, upload_id)
         query = """
         SELECT 
-            p.proj_id, p.proj_short_name, p.plan_start_date, p.plan_end_date, p.scd_end_date, p.proj_url
+            p.proj_id, MAX(p.proj_short_name) AS proj_short_name, MAX(p.plan_start_date) AS plan_start_date,
+            MAX(p.plan_end_date) AS plan_end_date, MAX(p.scd_end_date) AS scd_end_date, MAX(p.proj_url) AS proj_url
         """
         
         if REPORT_CONFIG['project_overview']['include_categories']:
             query += ", GROUP_CONCAT(DISTINCT rcv.rsrc_catg_name) AS project_categories"
         
         if REPORT_CONFIG['project_overview']['include_location']:
-            query += ", p.location_id"
+            query += ", MAX(p.location_id) AS location_id"
         
         if REPORT_CONFIG['project_overview']['include_cost']:
-            query += ", SUM(tr.target_cost) AS total_target_cost"
+            query += ", SUM(CAST(NULLIF(tr.target_cost, '') AS DOUBLE)) AS total_target_cost"
         
         if REPORT_CONFIG['project_overview']['include_wbs']:
             query += ", GROUP_CONCAT(DISTINCT t.wbs_id) AS top_level_wbs"
         
-        query += ", p.fy_start_month_num AS obs_name"
+        query += ", MAX(p.fy_start_month_num) AS obs_name"
         
         if REPORT_CONFIG['project_overview']['include_custom_fields']:
             query += ", GROUP_CONCAT(DISTINCT uv.udf_type_id || ': ' || uv.udf_text) AS custom_fields"
@@ -133,7 +145,7 @@ def generate_project_overview_report(db_path, upload_id):
         GROUP BY p.proj_id
         """
         
-        project_df = execute_query(conn, query, params=(upload_id,))
+        project_df = execute_query(conn, query, params=(upload_id,), analytics_conn=analytics_conn)
         if project_df is None:
             return None
 
@@ -143,7 +155,7 @@ def generate_project_overview_report(db_path, upload_id):
         WHERE xer_file_id = ? AND task_type = 'Milestone'
         ORDER BY early_start_date
         """
-        milestones_df = execute_query(conn, milestones_query, params=(upload_id,))
+        milestones_df = execute_query(conn, milestones_query, params=(upload_id,), analytics_conn=analytics_conn)
         if milestones_df is None:
             return None
 
@@ -239,6 +251,8 @@ def generate_project_overview_report(db_path, upload_id):
         return None
     finally:
         conn.close()
+        if analytics_conn:
+            analytics_conn.close()
 
 def generate_task_timeline_report(db_path, upload_id):
     """Generate a task timeline report."""
@@ -246,16 +260,20 @@ def generate_task_timeline_report(db_path, upload_id):
     if not conn:
         return None
 
+    analytics_conn = None
     try:
+        analytics_conn = connect_analytics(conn, db_path, upload_id)
         query = """
         SELECT 
-            t.task_code, t.task_name, t.early_start_date, t.early_end_date, 
-            t.late_start_date, t.late_end_date, t.total_float_hr_cnt, t.free_float_hr_cnt,
-            t.cstr_type, t.cstr_date,
+            MAX(t.task_code) AS task_code, MAX(t.task_name) AS task_name,
+            MAX(t.early_start_date) AS early_start_date, MAX(t.early_end_date) AS early_end_date,
+            MAX(t.late_start_date) AS late_start_date, MAX(t.late_end_date) AS late_end_date,
+            MAX(t.total_float_hr_cnt) AS total_float_hr_cnt, MAX(t.free_float_hr_cnt) AS free_float_hr_cnt,
+            MAX(t.cstr_type) AS cstr_type, MAX(t.cstr_date) AS cstr_date,
             GROUP_CONCAT(DISTINCT tp.pred_task_id || ' (' || tp.pred_type || ')') AS predecessors,
             GROUP_CONCAT(DISTINCT ac.actv_code_type_id || ': ' || ac.actv_code_name) AS activity_codes,
             COUNT(DISTINCT tr.rsrc_id) AS assigned_resources,
-            tm.task_memo,
+            MAX(tm.task_memo) AS task_memo,
             GROUP_CONCAT(DISTINCT uv.udf_type_id || ': ' || uv.udf_text) AS custom_fields
         FROM TASK t
         LEFT JOIN TASKPRED tp ON t.task_id = tp.task_id AND t.xer_file_id = tp.xer_file_id
@@ -266,10 +284,10 @@ def generate_task_timeline_report(db_path, upload_id):
         LEFT JOIN UDFVALUE uv ON t.task_id = uv.fk_id AND t.xer_file_id = uv.xer_file_id
         WHERE t.xer_file_id = ?
         GROUP BY t.task_id
-        ORDER BY t.early_start_date
+        ORDER BY early_start_date
         """
         
-        tasks_df = execute_query(conn, query, params=(upload_id,))
+        tasks_df = execute_query(conn, query, params=(upload_id,), analytics_conn=analytics_conn)
         if tasks_df is None:
             return None
 
@@ -305,6 +323,8 @@ def generate_task_timeline_report(db_path, upload_id):
         return None
     finally:
         conn.close()
+        if analytics_conn:
+            analytics_conn.close()
 
 def generate_resource_allocation_report(db_path, upload_id):
     """Generate a resource allocation report for the given project."""
@@ -312,13 +332,16 @@ def generate_resource_allocation_report(db_path, upload_id):
     if not conn:
         return None
 
+    analytics_conn = None
     try:
+        analytics_conn = connect_analytics(conn, db_path, upload_id)
         query = """
         SELECT 
-            r.rsrc_id, r.rsrc_name, t.task_name, tr.target_qty, tr.act_reg_qty, tr.remain_qty,
-            c.clndr_name, rr.cost_per_qty, 
+            MAX(r.rsrc_id) AS rsrc_id, MAX(r.rsrc_name) AS rsrc_name, MAX(t.task_name) AS task_name,
+            MAX(tr.target_qty) AS target_qty, MAX(tr.act_reg_qty) AS act_reg_qty, MAX(tr.remain_qty) AS remain_qty,
+            MAX(c.clndr_name) AS clndr_name, MAX(CAST(NULLIF(rr.cost_per_qty, '') AS DOUBLE)) AS cost_per_qty,
             GROUP_CONCAT(DISTINCT rcv.rsrc_catg_name) AS resource_categories,
-            tr.curv_id AS resource_curve,
+            MAX(tr.curv_id) AS resource_curve,
             GROUP_CONCAT(DISTINCT uv.udf_type_id || ': ' || uv.udf_text) AS custom_fields
         FROM TASKRSRC tr
         JOIN RSRC r ON tr.rsrc_id = r.rsrc_id AND tr.xer_file_id = r.xer_file_id
@@ -330,10 +353,10 @@ def generate_resource_allocation_report(db_path, upload_id):
         LEFT JOIN UDFVALUE uv ON r.rsrc_id = uv.fk_id AND r.xer_file_id = uv.xer_file_id
         WHERE tr.xer_file_id = ?
         GROUP BY tr.taskrsrc_id
-        ORDER BY r.rsrc_name, t.task_name
+        ORDER BY rsrc_name, task_name
         """
         
-        resource_allocation_df = execute_query(conn, query, params=(upload_id,))
+        resource_allocation_df = execute_query(conn, query, params=(upload_id,), analytics_conn=analytics_conn)
         if resource_allocation_df is None:
             return None
 
@@ -358,6 +381,8 @@ def generate_resource_allocation_report(db_path, upload_id):
         return None
     finally:
         conn.close()
+        if analytics_conn:
+            analytics_conn.close()
 
 def generate_combined_report(db_path, upload_id):
     """Generate a combined report including project overview, task timeline, and resource allocation."""